@@ -1,9 +1,13 @@
 import logging
 import warnings
-from src.config import SCRAPERS_CONFIG, DATA_DIR
+from src.config import SCRAPERS_CONFIG, DATA_DIR, WAREHOUSE_ENABLED, WAREHOUSE_DB
+from src.config import MATCHING_ENABLED, VALIDATION_ENABLED
 from src.scrapers.hipermaxi import scrape_hipermaxi
 from src.scrapers.farmacorp import scrape_farmacorp
 from src.utils.storage import export_data
+from src.utils.warehouse import load_files
+from src.utils.matching import update_matches
+from src.utils.validation import validate_data
 
 # Configurar logging
 logging.basicConfig(
@@ -22,13 +26,25 @@ def main():
     logger.info("INICIANDO...")
     logger.info("="*20)
     
+    # Archivos exportados en esta ejecución, para el almacén
+    exportados = []
+    
     # Scraper Hipermaxi
     if SCRAPERS_CONFIG['hipermaxi']['enabled']:
         try:
             data = scrape_hipermaxi(SCRAPERS_CONFIG['hipermaxi'])
             
+            if data and VALIDATION_ENABLED:
+                # Un error en la validación no debe descartar el scraping del día
+                try:
+                    data, _ = validate_data(data, 'hipermaxi', DATA_DIR)
+                except Exception as e:
+                    logger.warning(f"Validación hipermaxi fallida, se exporta sin validar: {e}", exc_info=True)
+            
             if data:
-                export_data(data, 'hipermaxi', DATA_DIR, 'csv', False)
+                filepath = export_data(data, 'hipermaxi', DATA_DIR, 'csv', False)
+                if filepath:
+                    exportados.append(('hipermaxi', filepath))
             else:
                 logger.error("No se obtuvieron datos de Hipermaxi")
                 
@@ -40,14 +56,37 @@ def main():
         try:
             data = scrape_farmacorp(SCRAPERS_CONFIG['farmacorp'])
             
+            if data and VALIDATION_ENABLED:
+                # Un error en la validación no debe descartar el scraping del día
+                try:
+                    data, _ = validate_data(data, 'farmacorp', DATA_DIR)
+                except Exception as e:
+                    logger.warning(f"Validación farmacorp fallida, se exporta sin validar: {e}", exc_info=True)
+            
             if data:
-                export_data(data, 'farmacorp', DATA_DIR, 'csv', True)
+                filepath = export_data(data, 'farmacorp', DATA_DIR, 'csv', True)
+                if filepath:
+                    exportados.append(('farmacorp', filepath))
             else:
                 logger.error("No se obtuvieron datos de Farmacorp")
                 
         except Exception as e:
             logger.error(f"Error en scraper Farmacorp: {e}", exc_info=True)
 
+    # Almacén: una sola transacción para toda la ejecución
+    if WAREHOUSE_ENABLED and exportados:
+        try:
+            load_files(exportados, WAREHOUSE_DB)
+        except Exception as e:
+            logger.error(f"Error cargando el almacén: {e}", exc_info=True)
+
+    # Emparejamiento de productos entre fuentes
+    if MATCHING_ENABLED:
+        try:
+            update_matches('hipermaxi', 'farmacorp')
+        except Exception as e:
+            logger.error(f"Error en emparejamiento de productos: {e}", exc_info=True)
+
     logger.info("\n" + "="*20)
     logger.info("SCRAPING COMPLETADO")
 
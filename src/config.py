@@ -3,9 +3,26 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data" / "raw"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
+ARCHIVE_DIRNAME = "archivo"  # meses cerrados compactados: data/raw/{fuente}/archivo/{YYYYMM}.csv.gz
+
+# Almacén SQLite opcional (no se versiona)
+WAREHOUSE_ENABLED = False
+WAREHOUSE_DB = BASE_DIR / "data" / "precios.db"
+
+# Emparejamiento de productos entre fuentes
+MATCHING_ENABLED = True
+MATCHING_DIR = BASE_DIR / "data" / "matching"
+
+# Validación de datos antes de exportar
+VALIDATION_ENABLED = True
+QUARANTINE_DIR = BASE_DIR / "data" / "cuarentena"
 
 TIMEOUT = 15
 REQUEST_DELAY = 0.5  # segundos entre peticiones
+# Procesos para parseo JSON (0 = mismo proceso). Sin efecto útil mientras la
+# paginación sea secuencial: cada página se espera antes de pedir la siguiente,
+# así que un pool solo agrega costo; activarlo cuando el fetch sea concurrente
+PARSE_WORKERS = 0
 
 SCRAPERS_CONFIG = {
     'hipermaxi': {
@@ -3,13 +3,14 @@ import time
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict
-from src.utils.shopify import get_all_products, extract_product_data
+from src.utils.shopify import get_all_product_batches
 from src.utils.products import productos_unicos
-from src.config import DATA_DIR, REQUEST_DELAY
+from src.utils.parsing import get_parse_pool, concat_batches
+from src.config import DATA_DIR, REQUEST_DELAY, PARSE_WORKERS
 
 logger = logging.getLogger(__name__)
     
-def scrape_farmacorp(config: dict) -> List[Dict]:
+def scrape_farmacorp(config: dict) -> Dict[str, list]:
     """
     Ejecuta el scraping completo de Farmacorp
     
@@ -17,7 +18,7 @@ def scrape_farmacorp(config: dict) -> List[Dict]:
         config: Diccionario con configuración del scraper
         
     Returns:
-        Lista de diccionarios con precios (IdProducto, PrecioVenta, PrecioOriginal)
+        Columnas de precios (IdProducto, PrecioVenta, PrecioOriginal)
     """
     logger.info("="*20)
     logger.info("INICIANDO SCRAPER FARMACORP")
@@ -25,46 +26,26 @@ def scrape_farmacorp(config: dict) -> List[Dict]:
     base_url = config['base_url']
     delay = REQUEST_DELAY
     
-    # 1. Obtener todos los productos desde products.json
-    logger.info("PASO 1: Obteniendo productos...")
-    productos = get_all_products(base_url, limit=250, delay=delay)
+    # 1. Obtener y procesar todos los productos desde products.json
+    logger.info("PASO 1: Obteniendo y procesando productos...")
+    with get_parse_pool(config.get('parse_workers', PARSE_WORKERS)) as pool:
+        lotes = get_all_product_batches(base_url, limit=250, delay=delay, pool=pool)
     
-    if not productos:
+    columnas = concat_batches(lotes)
+    if not columnas:
         logger.error("No se obtuvieron productos")
-        return []
-    
-    # 2. Procesar productos
-    logger.info("PASO 2: Procesando productos...")
-    all_precios = []
-    all_productos_maestro = []
-    
-    for producto in productos:
-        try:
-            # Extraer datos básicos
-            data = extract_product_data(producto)
-            
-            if not data or not data['IdProducto']:
-                continue
-            
-            sku = data['IdProducto']
-            
-            # Datos para archivo diario de precios
-            precio_data = {
-                'IdProducto': sku,
-                'PrecioVenta': data['PrecioVenta'],
-                'PrecioOriginal': data['PrecioOriginal'],
-            }
-            all_precios.append(precio_data)
-            
-            # Datos para maestro de productos
-            producto_maestro = {
-                'IdProducto': sku,
-                'Descripcion': data['Descripcion'],
-            }
-            all_productos_maestro.append(producto_maestro)
-            
-        except Exception as e:
-            logger.error(f"Error procesando producto {producto.get('id')}: {e}")
+        return {}
+    
+    # 2. Separar columnas
+    logger.info("PASO 2: Separando precios y maestro de productos...")
+    # Datos para archivo diario de precios
+    all_precios = {
+        col: columnas[col] for col in ['IdProducto', 'PrecioVenta', 'PrecioOriginal']
+    }
+    # Datos para maestro de productos
+    all_productos_maestro = {
+        col: columnas[col] for col in ['IdProducto', 'Descripcion']
+    }
     
     # 3. Guardar maestro de productos
     logger.info("PASO 3: Guardando listado de productos...")
@@ -72,6 +53,6 @@ def scrape_farmacorp(config: dict) -> List[Dict]:
     
     logger.info("="*20)
     logger.info(f"SCRAPER FARMACORP FINALIZADO")
-    logger.info(f"  - Productos procesados: {len(all_precios)}")
+    logger.info(f"  - Productos procesados: {len(all_precios['IdProducto'])}")
     
-    return all_precios
\ No newline at end of file
+    return all_precios
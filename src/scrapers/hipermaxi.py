@@ -1,17 +1,23 @@
 import requests
+import json
 import time
 import logging
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
-from src.config import TIMEOUT, REQUEST_DELAY
+from concurrent.futures.process import BrokenProcessPool
+from src.config import TIMEOUT, REQUEST_DELAY, PARSE_WORKERS
 from src.config import DATA_DIR
 from src.utils.auth import get_authenticated_session
 from src.utils.auth import get_bare_headers
 from src.utils.products import productos_unicos
+from src.utils.parsing import get_parse_pool, submit_parse, concat_batches
+from src.utils.paging import get_page_size
 
 logger = logging.getLogger(__name__)
 
+MAX_REINTENTOS_PAGINA = 3
+
 def get_session():
     session = requests.Session()
     session.verify = False
@@ -115,19 +121,43 @@ def get_categorias_subcategorias(session: requests.Session, headers: dict, base_
         logger.error(f"Error obteniendo categorías: {e}")
         return []
 
+def parse_productos(content: bytes) -> Optional[Dict[str, list]]:
+    """
+    Decodifica una página de /public/productos a un lote columnar.
+    Puede ejecutarse en el pool de parseo, por eso recibe bytes y no la respuesta
+    """
+    data = json.loads(content)
+
+    if data.get('ConError') or data.get('Estado') != 200:
+        return None
+
+    datos = data.get('Dato') or []
+    return {
+        'IdProducto': [p.get('IdProducto') for p in datos],
+        'PrecioVenta': [p.get('PrecioVenta') for p in datos],
+        'PrecioOriginal': [p.get('PrecioOriginal') for p in datos],
+        'Descripcion': [p.get('Descripcion') for p in datos],
+    }
+
 def get_productos(session: requests.Session, headers: dict, base_url: str,
                  id_market: int, id_locatario: int, id_categoria: int = None,
-                 id_subcategoria: int = None) -> List[Dict]:
+                 id_subcategoria: int = None, pool=None) -> List[Dict[str, list]]:
     """
-    Obtiene productos de una categoría específica con paginación
+    Obtiene productos de una categoría específica con paginación adaptativa.
+    Una página fallida se reintenta con un tamaño menor en lugar de abandonar la sucursal.
+    Retorna lotes columnares, uno por página
     """
-    productos = []
-    pagina = 1
-    cantidad = 1000
+    lotes = []
+    offset = 0  # productos obtenidos hasta ahora
+    errores = 0
+    url = f"{base_url}/public/productos"
+    # Tamaño de página adaptativo, compartido entre sucursales del mismo endpoint
+    paginado = get_page_size(url)
     
     while True:
+        cantidad = paginado.size
+        pagina = paginado.page_for(offset)
         try:
-            url = f"{base_url}/public/productos"
             params = {
                 'IdMarket': id_market,
                 'IdLocatario': id_locatario,
@@ -138,34 +168,49 @@ def get_productos(session: requests.Session, headers: dict, base_url: str,
             if id_subcategoria is not None:
                 params['IdsSubcategoria[0]'] = id_subcategoria
             
+            inicio = time.monotonic()
             response = session.get(url, params=params, headers=headers, timeout=TIMEOUT)
             #logger.info("URL real ejecutada: %s", response.url)
             response.raise_for_status()
-            data = response.json()
+            latencia = time.monotonic() - inicio
             
-            if data.get('ConError') or data.get('Estado') != 200:
-                break
+            lote = submit_parse(pool, parse_productos, response.content).result()
+            
+            if lote is None:
+                raise ValueError("respuesta con error de la API")
             
-            datos = data.get('Dato', [])
-            if not datos:
+            total = len(lote['IdProducto'])
+            if not total:
                 break
             
-            productos.extend(datos)
+            lotes.append(lote)
+            offset += total
+            errores = 0
             
-            if len(datos) < cantidad:
+            if total < cantidad:
                 break
             
-            pagina += 1
+            paginado.on_success(latencia, len(response.content), offset)
             time.sleep(REQUEST_DELAY)
             
-        except Exception as e:
-            logger.error(f"Error obteniendo productos página {pagina}: {e}")
+        except BrokenProcessPool as e:
+            # Reintentar no sirve si el pool de parseo murió; se conservan las páginas obtenidas
+            logger.error(f"Pool de parseo caído en página {pagina}: {e}")
             break
+        except Exception as e:
+            errores += 1
+            logger.error(f"Error obteniendo productos página {pagina} (cantidad {cantidad}): {e}")
+            if errores > MAX_REINTENTOS_PAGINA:
+                logger.error(f"Se abandona la sucursal {id_market}-{id_locatario} tras {errores} errores")
+                break
+            # Reintentar desde el mismo desplazamiento con una página más pequeña
+            paginado.on_error()
+            time.sleep(REQUEST_DELAY * errores)
     
-    return productos
+    return lotes
 
-def scrape_hipermaxi(config: dict) -> List[Dict]:
-    """Ejecuta el scraping completo de Hipermaxi"""
+def scrape_hipermaxi(config: dict) -> Dict[str, list]:
+    """Ejecuta el scraping completo de Hipermaxi (retorna columnas de precios)"""
     logger.info("="*20)
     logger.info("INICIANDO SCRAPING: HIPERMAXI")
     
@@ -207,48 +252,54 @@ def scrape_hipermaxi(config: dict) -> List[Dict]:
 
     if not sucursales:
         logger.error("No se pudieron obtener sucursales")
-        return []
+        return {}
     
-    all_productos = []
-    all_productos_raw = []
+    lotes = []
     
-    for idx, sucursal in enumerate(sucursales, 1):
-        logger.info(f"\n[{idx}/{len(sucursales)}] Procesando: {sucursal['Descripcion']} - {sucursal['IdMarket']}-{sucursal['IdSucursal']}")
+    with get_parse_pool(config.get('parse_workers', PARSE_WORKERS)) as pool:
+        for idx, sucursal in enumerate(sucursales, 1):
+            logger.info(f"\n[{idx}/{len(sucursales)}] Procesando: {sucursal['Descripcion']} - {sucursal['IdMarket']}-{sucursal['IdSucursal']}")
 
-        # Obtener productos
-        productos = get_productos(
-            session, headers, base_url,
-            sucursal['IdMarket'],
-            sucursal['IdSucursal'],
-        )    
+            # Obtener productos
+            lotes_sucursal = get_productos(
+                session, headers, base_url,
+                sucursal['IdMarket'],
+                sucursal['IdSucursal'],
+                pool=pool,
+            )
             
-        # Agregar y eliminar variables 
-        for producto in productos:
-            lista_precios = {
-                'IdProducto': producto.get('IdProducto'),
-                'PrecioVenta': producto.get('PrecioVenta'),
-                'PrecioOriginal': producto.get('PrecioOriginal'),
-                'IdMarket': sucursal['IdMarket'],
-                'IdRegion': sucursal['IdRegion'],
-            }
-            all_productos.append(lista_precios)
+            # Agregar columnas de la sucursal a cada lote
+            total_sucursal = 0
+            for lote in lotes_sucursal:
+                total = len(lote['IdProducto'])
+                lote['IdMarket'] = [sucursal['IdMarket']] * total
+                lote['IdRegion'] = [sucursal['IdRegion']] * total
+                total_sucursal += total
+            lotes.extend(lotes_sucursal)
             
-            # Guardamos productos para comparación
-            lista_productos = {
-                'IdProducto': producto.get('IdProducto'),
-                'Descripcion': producto.get('Descripcion'),
-            }
-            all_productos_raw.append(lista_productos)
-        
-        logger.info(f"Total Productos Sucursal: {len(productos)}")
-        
-        time.sleep(REQUEST_DELAY)
+            logger.info(f"Total Productos Sucursal: {total_sucursal}")
+            
+            time.sleep(REQUEST_DELAY)
+    
+    columnas = concat_batches(lotes)
+    if not columnas:
+        logger.error("No se obtuvieron productos")
+        return {}
+    
+    all_productos = {
+        col: columnas[col]
+        for col in ['IdProducto', 'PrecioVenta', 'PrecioOriginal', 'IdMarket', 'IdRegion']
+    }
+    # Guardamos productos para comparación
+    all_productos_raw = {
+        col: columnas[col] for col in ['IdProducto', 'Descripcion']
+    }
     
     # Guardamos lista de productos únicos con id y descripción
     productos_unicos(all_productos_raw, source='hipermaxi')
     
     logger.info(f"\n{'='*20}")
     logger.info(f"RESUMEN HIPERMAXI")
-    logger.info(f"Total productos: {len(all_productos)}")
+    logger.info(f"Total productos: {len(all_productos['IdProducto'])}")
     
     return all_productos
@@ -0,0 +1,165 @@
+"""
+Compactación mensual de los archivos diarios
+Un mes después de cerrado (el mes anterior se conserva como historial), los
+archivos data/raw/{fuente}/{YYYYMM}/{YYYYMMDD}.csv.gz se reemplazan por un único
+archivo data/raw/{fuente}/archivo/{YYYYMM}.csv.gz con una columna 'fecha',
+ordenado por producto y fecha para que gzip aproveche los precios repetidos
+entre días.
+
+No hay fragmentación por contenido (chunks): un archivo mensual se deduplica
+en git solo si su contenido es idéntico byte a byte (gzip con mtime=0).
+
+Uso:
+    python -m src.utils.compaction
+"""
+
+import logging
+import subprocess
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from src.config import BASE_DIR, DATA_DIR, ARCHIVE_DIRNAME
+from src.utils.storage import GZIP_DETERMINISTA
+
+logger = logging.getLogger(__name__)
+
+
+def read_daily(filepath: Path) -> pd.DataFrame:
+    """Lee un archivo diario agregando la columna 'fecha' (YYYYMMDD) desde su nombre"""
+    filepath = Path(filepath)
+    df = pd.read_csv(filepath, dtype={'IdProducto': str}, encoding='utf-8-sig')
+    df.insert(0, 'fecha', filepath.name[:8])
+    return df
+
+
+def read_archive(archive_path: Path) -> pd.DataFrame:
+    """Lee un archivo mensual compactado"""
+    return pd.read_csv(archive_path, dtype={'IdProducto': str, 'fecha': str}, encoding='utf-8-sig')
+
+
+def _versionado_sin_checkout(path: Path) -> bool:
+    """True si el archivo está versionado en git pero no existe en el árbol de trabajo (checkout parcial)"""
+    if Path(path).exists():
+        return False
+    try:
+        resultado = subprocess.run(['git', 'ls-files', '--error-unmatch', str(path)],
+                                   cwd=BASE_DIR, capture_output=True)
+    except OSError:
+        return False
+    return resultado.returncode == 0
+
+
+def compact_month(month_dir: Path) -> Optional[Path]:
+    """
+    Compacta los archivos diarios de un mes en un archivo mensual
+    y elimina los diarios una vez verificado el resultado
+    
+    Args:
+        month_dir: Carpeta data/raw/{fuente}/{YYYYMM}
+        
+    Returns:
+        Ruta del archivo mensual, o None si no había archivos diarios
+        o si no se pudo compactar
+    """
+    month_dir = Path(month_dir)
+    filepaths = sorted(month_dir.glob('*.csv.gz'))
+    if not filepaths:
+        return None
+    
+    archive_path = month_dir.parent / ARCHIVE_DIRNAME / f"{month_dir.name}.csv.gz"
+    
+    # Con checkout parcial el archivo mensual puede existir en git sin estar en disco;
+    # escribirlo ahora lo reemplazaría solo con los días nuevos
+    if _versionado_sin_checkout(archive_path):
+        logger.error(f"{archive_path} está versionado pero no descargado; no se compacta {month_dir}")
+        return None
+    
+    frames = []
+    if archive_path.exists():
+        # Mes ya compactado parcialmente: se agregan los días nuevos
+        frames.append(read_archive(archive_path))
+    for filepath in filepaths:
+        frames.append(read_daily(filepath))
+    
+    df = pd.concat(frames, ignore_index=True)
+    keys = [col for col in ['IdMarket', 'IdProducto'] if col in df.columns] + ['fecha']
+    df = df.sort_values(by=keys, kind='stable')
+    
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(archive_path, index=False, encoding='utf-8-sig', compression=GZIP_DETERMINISTA)
+    
+    # Verificar antes de eliminar los diarios
+    escritas = len(pd.read_csv(archive_path, usecols=['fecha']))
+    if escritas != len(df):
+        logger.error(f"Verificación fallida en {archive_path}: {escritas} != {len(df)}")
+        return None
+    
+    for filepath in filepaths:
+        filepath.unlink()
+    if not any(month_dir.iterdir()):
+        month_dir.rmdir()
+    
+    logger.info(f"[OK] {len(filepaths)} archivos diarios compactados en {archive_path} ({len(df)} registros)")
+    return archive_path
+
+
+def mes_anterior(mes: str) -> str:
+    """Mes anterior en formato YYYYMM"""
+    anio, m = int(mes[:4]), int(mes[4:])
+    return f"{anio - 1}12" if m == 1 else f"{anio}{m - 1:02d}"
+
+
+def compact_closed_months(data_dir: Path = DATA_DIR, hoy: datetime = None) -> List[Path]:
+    """
+    Compacta los meses cerrados presentes en data_dir, excepto el mes anterior,
+    que se mantiene en archivos diarios como historial para la validación
+    
+    Args:
+        data_dir: DATA_DIR
+        hoy: Fecha de referencia (por defecto, ahora)
+        
+    Returns:
+        Rutas de los archivos mensuales generados
+    """
+    # Se compactan los meses anteriores al mes pasado
+    limite = mes_anterior((hoy or datetime.now()).strftime("%Y%m"))
+    
+    archivos = []
+    for source_dir in sorted(p for p in Path(data_dir).iterdir() if p.is_dir()):
+        for month_dir in sorted(source_dir.iterdir()):
+            if month_dir.is_dir() and month_dir.name.isdigit() and month_dir.name < limite:
+                archive_path = compact_month(month_dir)
+                if archive_path:
+                    archivos.append(archive_path)
+    return archivos
+
+
+def read_month(source_dir: Path, mes: str) -> pd.DataFrame:
+    """
+    Lee todos los registros de un mes, compactado o no, con columna 'fecha' (YYYYMMDD)
+    
+    Args:
+        source_dir: Carpeta data/raw/{fuente}
+        mes: Mes en formato YYYYMM
+    """
+    source_dir = Path(source_dir)
+    frames = []
+    
+    archive_path = source_dir / ARCHIVE_DIRNAME / f"{mes}.csv.gz"
+    if archive_path.exists():
+        frames.append(read_archive(archive_path))
+    for filepath in sorted((source_dir / mes).glob('*.csv.gz')):
+        frames.append(read_daily(filepath))
+    
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    compact_closed_months()
@@ -0,0 +1,306 @@
+"""
+Emparejamiento de productos entre fuentes (ej: Hipermaxi vs Farmacorp)
+Genera candidatos con un índice invertido de tokens sobre descripciones
+normalizadas y los puntúa con Jaccard ponderado por IDF (las palabras raras,
+como la marca, pesan más que 'sopa' o 'shampoo'); los códigos GTIN/EAN válidos que
+coinciden en ambas fuentes se emparejan de forma exacta.
+
+Los IdProducto se guardan sin ceros a la izquierda, igual que en productos.csv
+(productos_unicos los elimina), mientras que los archivos de precios conservan
+el SKU original. Para cruzar la tabla con precios usar clave_producto()
+sobre la columna IdProducto de los precios.
+
+Uso:
+    python -m src.utils.matching
+"""
+
+import logging
+import math
+import re
+import unicodedata
+import pandas as pd
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from src.config import DATA_DIR, MATCHING_DIR
+
+logger = logging.getLogger(__name__)
+
+UMBRAL = 0.6  # similitud mínima (Jaccard ponderado) para aceptar un par
+MAX_CANDIDATOS = 20  # candidatos evaluados por producto
+TOP_K = 3  # candidatos guardados por producto (el siguiente sube si el mejor se asigna a otro)
+MAX_DF = 0.02  # tokens en más del 2% de productos no se indexan
+
+STOPWORDS = {'de', 'del', 'la', 'el', 'los', 'las', 'con', 'sin', 'y', 'en', 'para', 'x', 'por', 'a'}
+UNIDADES = {
+    'g': 'gr', 'grs': 'gr', 'gramos': 'gr',
+    'mgs': 'mg', 'miligramos': 'mg',
+    'kgs': 'kg', 'kilo': 'kg',
+    'mls': 'ml', 'cc': 'ml',
+    'lt': 'l', 'lts': 'l', 'litro': 'l', 'litros': 'l',
+    'und': 'un', 'unid': 'un', 'unidades': 'un', 'unidad': 'un',
+}
+
+UNIDADES_BASE = set(UNIDADES.values()) | {'mg'}
+NUMERO = re.compile(r'^\d+(?:\.\d+)?$')
+CANTIDAD = re.compile(r'^\d+(?:\.\d+)?(?:' + '|'.join(sorted(UNIDADES_BASE)) + r')$')
+
+COLUMNS = ['IdProductoA', 'IdProductoB', 'Score', 'Metodo']
+
+
+def normalizar(texto: str) -> Set[str]:
+    """
+    Normaliza una descripción a un conjunto de tokens
+    (minúsculas, sin acentos, unidades unificadas y pegadas a su cantidad)
+    """
+    if not isinstance(texto, str):
+        return set()
+    
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    # Separar cantidades de unidades: "500ml" -> "500 ml"
+    texto = re.sub(r'(\d)([a-z])', r'\1 \2', texto)
+    palabras = re.findall(r'\d+(?:[.,]\d+)?|[a-z]+', texto)
+    
+    tokens = set()
+    previo = None
+    for palabra in palabras:
+        palabra = UNIDADES.get(palabra, palabra)
+        if previo is not None and palabra in UNIDADES_BASE:
+            # "500 ml" -> "500ml"
+            tokens.discard(previo)
+            tokens.add(previo.replace(',', '.') + palabra)
+            previo = None
+            continue
+        previo = palabra if palabra[0].isdigit() else None
+        if palabra not in STOPWORDS:
+            tokens.add(palabra)
+    return tokens
+
+
+def cantidades(tokens: Set[str]) -> Set[str]:
+    """Tokens de cantidad con unidad (ej: '500ml', '3l', '100un')"""
+    return {token for token in tokens if CANTIDAD.match(token)}
+
+
+def numeros(tokens: Set[str]) -> Set[str]:
+    """Números sueltos (tonos, modelos, cantidades sin unidad)"""
+    return {token for token in tokens if NUMERO.match(token)}
+
+
+def cantidades_distintas(toks: Set[str], otros: Set[str]) -> bool:
+    """
+    True si ambos productos declaran cantidades (ej: '500ml') o números sueltos
+    (ej: tono '42') y no coinciden: se trata de otro tamaño o variante
+    """
+    for extraer in (cantidades, numeros):
+        propias, ajenas = extraer(toks), extraer(otros)
+        if propias and ajenas and propias != ajenas:
+            return True
+    return False
+
+
+def clave_producto(ids: pd.Series) -> pd.Series:
+    """Clave de cruce con la tabla de emparejamientos: IdProducto sin ceros a la izquierda"""
+    return ids.astype(str).str.lstrip('0')
+
+
+def es_gtin(codigo: str) -> bool:
+    """Valida un código GTIN-8/12/13/14 por su dígito verificador"""
+    if not isinstance(codigo, str) or not codigo.isdigit() or len(codigo) not in (8, 12, 13, 14):
+        return False
+    digitos = [int(d) for d in codigo]
+    suma = sum(d * (3 if i % 2 else 1) for i, d in enumerate(reversed(digitos[:-1]), 1))
+    return (10 - suma % 10) % 10 == digitos[-1]
+
+
+def gtin_canonico(codigo: str):
+    """
+    GTIN normalizado a 14 dígitos, o None si no es un GTIN válido.
+    Los maestros pierden los ceros a la izquierda, por eso se prueba
+    también el código completado a 13 y 14 dígitos
+    """
+    if not isinstance(codigo, str) or not codigo.isdigit():
+        return None
+    for candidato in (codigo, codigo.zfill(13), codigo.zfill(14)):
+        if es_gtin(candidato):
+            return candidato.zfill(14)
+    return None
+
+
+def _indexar(tokens: Dict[str, Set[str]]) -> Dict[str, List[str]]:
+    """Índice invertido token -> IdProducto, omitiendo tokens demasiado frecuentes"""
+    index = defaultdict(list)
+    for id_producto, toks in tokens.items():
+        for token in toks:
+            index[token].append(id_producto)
+    
+    max_df = max(1, int(MAX_DF * len(tokens)))
+    return {token: ids for token, ids in index.items() if len(ids) <= max_df}
+
+
+def _pesos(*corpus: Dict[str, Set[str]]) -> Dict[str, float]:
+    """IDF de cada token sobre los productos de todas las fuentes"""
+    df = Counter(token for tokens in corpus for toks in tokens.values() for token in toks)
+    total = sum(len(tokens) for tokens in corpus)
+    return {token: math.log(total / n) for token, n in df.items()}
+
+
+def _similitud(toks: Set[str], otros: Set[str], pesos: Dict[str, float]) -> float:
+    """Jaccard ponderado por IDF"""
+    union = sum(pesos.get(t, 0.0) for t in toks | otros)
+    if not union:
+        return 0.0
+    return sum(pesos.get(t, 0.0) for t in toks & otros) / union
+
+
+def _emparejar(consultas: Dict[str, Set[str]], index: Dict[str, List[str]],
+               tokens: Dict[str, Set[str]], pesos: Dict[str, float]) -> List[Tuple[str, str, float]]:
+    """Hasta TOP_K candidatos por producto consultado (id_consulta, id_indexado, score)"""
+    pares = []
+    for id_consulta, toks in consultas.items():
+        conteo = Counter()
+        for token in toks:
+            conteo.update(index.get(token, ()))
+        
+        puntuados = []
+        for candidato, _ in conteo.most_common(MAX_CANDIDATOS):
+            otros = tokens[candidato]
+            if cantidades_distintas(toks, otros):
+                continue
+            score = _similitud(toks, otros, pesos)
+            if score >= UMBRAL:
+                puntuados.append((score, candidato))
+        
+        for score, candidato in sorted(puntuados, reverse=True)[:TOP_K]:
+            pares.append((id_consulta, candidato, round(score, 4)))
+    return pares
+
+
+def _asignar(candidatos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Asignación uno a uno: recorre los candidatos de mayor a menor score
+    (GTIN primero en empate) y acepta un par si ninguno de sus productos fue asignado
+    """
+    candidatos = candidatos.sort_values(by=['Score', 'Metodo', 'IdProductoA', 'IdProductoB'],
+                                        ascending=[False, False, True, True])
+    usados_a, usados_b = set(), set()
+    aceptados = []
+    for idx, a, b in zip(candidatos.index, candidatos['IdProductoA'], candidatos['IdProductoB']):
+        if a in usados_a or b in usados_b:
+            continue
+        usados_a.add(a)
+        usados_b.add(b)
+        aceptados.append(idx)
+    return candidatos.loc[aceptados].sort_values(by=['IdProductoA', 'IdProductoB'])
+
+
+def _cargar_productos(source: str, data_dir: Path) -> pd.DataFrame:
+    """Carga el maestro productos.csv de una fuente (IdProducto sin ceros a la izquierda)"""
+    df = pd.read_csv(data_dir / source / 'productos.csv', dtype={'IdProducto': str},
+                     encoding='utf-8-sig')
+    df = df.dropna(subset=['IdProducto'])
+    df['IdProducto'] = clave_producto(df['IdProducto'])
+    return df[df['IdProducto'] != ''].drop_duplicates(subset='IdProducto')
+
+
+def update_matches(source_a: str = 'hipermaxi', source_b: str = 'farmacorp',
+                   data_dir: Path = DATA_DIR, output_dir: Path = MATCHING_DIR) -> pd.DataFrame:
+    """
+    Actualiza la tabla de emparejamientos entre dos fuentes.
+    Solo se buscan candidatos para productos no evaluados en ejecuciones anteriores;
+    la asignación uno a uno se recalcula sobre todos los candidatos guardados,
+    así un producto cuyo mejor candidato se asigna a otro puede usar el siguiente
+    
+    Args:
+        source_a: Fuente A (columna IdProductoA)
+        source_b: Fuente B (columna IdProductoB)
+        data_dir: DATA_DIR
+        output_dir: Carpeta donde se guardan emparejamientos y estado
+        
+    Returns:
+        DataFrame con los emparejamientos, uno por producto (IdProductoA, IdProductoB, Score, Metodo).
+        Los IdProducto no tienen ceros a la izquierda (ver clave_producto)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    matches_path = output_dir / f'{source_a}_{source_b}.csv'
+    candidatos_path = output_dir / f'{source_a}_{source_b}_candidatos.csv'
+    evaluados_path = output_dir / f'{source_a}_{source_b}_evaluados.csv'
+    
+    df_a = _cargar_productos(source_a, data_dir)
+    df_b = _cargar_productos(source_b, data_dir)
+    
+    if candidatos_path.exists() and evaluados_path.exists():
+        df_candidatos = pd.read_csv(candidatos_path, dtype={'IdProductoA': str, 'IdProductoB': str})
+        evaluados = pd.read_csv(evaluados_path, dtype={'IdProducto': str})
+        evaluados_a = set(evaluados.loc[evaluados['Fuente'] == source_a, 'IdProducto'])
+        evaluados_b = set(evaluados.loc[evaluados['Fuente'] == source_b, 'IdProducto'])
+    else:
+        df_candidatos = pd.DataFrame(columns=COLUMNS)
+        evaluados_a, evaluados_b = set(), set()
+    
+    tokens_a = dict(zip(df_a['IdProducto'], df_a['Descripcion'].map(normalizar)))
+    tokens_b = dict(zip(df_b['IdProducto'], df_b['Descripcion'].map(normalizar)))
+    nuevos_a = {k: v for k, v in tokens_a.items() if k not in evaluados_a}
+    nuevos_b = {k: v for k, v in tokens_b.items() if k not in evaluados_b}
+    
+    if not nuevos_a and not nuevos_b and matches_path.exists():
+        logger.info("No hay productos nuevos para emparejar")
+        return pd.read_csv(matches_path, dtype={'IdProductoA': str, 'IdProductoB': str})
+    
+    logger.info(f"Emparejando {source_a} ({len(nuevos_a)} nuevos) vs {source_b} ({len(nuevos_b)} nuevos)")
+    
+    # 1. Candidatos por índice invertido: nuevos de A contra todo B y viceversa
+    pesos = _pesos(tokens_a, tokens_b)
+    pares = [(a, b, s, 'descripcion') for a, b, s in
+             _emparejar(nuevos_a, _indexar(tokens_b), tokens_b, pesos)]
+    pares += [(a, b, s, 'descripcion') for b, a, s in
+              _emparejar(nuevos_b, _indexar(tokens_a), tokens_a, pesos)]
+    df_nuevos = pd.DataFrame(pares, columns=COLUMNS)
+    
+    # Candidatos previos: descartar productos eliminados y pares de distinto tamaño
+    vigentes = [
+        a in tokens_a and b in tokens_b and not cantidades_distintas(tokens_a[a], tokens_b[b])
+        for a, b in zip(df_candidatos['IdProductoA'], df_candidatos['IdProductoB'])
+    ]
+    df_candidatos = df_candidatos[pd.Series(vigentes, index=df_candidatos.index, dtype=bool)]
+    df_candidatos = pd.concat([df_candidatos, df_nuevos], ignore_index=True)
+    df_candidatos = df_candidatos.drop_duplicates(subset=['IdProductoA', 'IdProductoB'])
+    
+    # 2. Coincidencia exacta por GTIN/EAN (se recalcula completa, es barata)
+    gtin_a = {}
+    for k in tokens_a:
+        canonico = gtin_canonico(k)
+        if canonico:
+            gtin_a[canonico] = k
+    exactos = []
+    for k in tokens_b:
+        canonico = gtin_canonico(k)
+        if canonico in gtin_a:
+            exactos.append((gtin_a[canonico], k, 1.0, 'gtin'))
+    
+    # 3. Asignación uno a uno sobre todos los candidatos
+    df_matches = _asignar(pd.concat([df_candidatos, pd.DataFrame(exactos, columns=COLUMNS)],
+                                    ignore_index=True))
+    
+    df_candidatos.sort_values(by=['IdProductoA', 'IdProductoB']).to_csv(
+        candidatos_path, index=False, encoding='utf-8-sig'
+    )
+    df_matches.to_csv(matches_path, index=False, encoding='utf-8-sig')
+    pd.DataFrame(
+        [(source_a, k) for k in sorted(tokens_a)] + [(source_b, k) for k in sorted(tokens_b)],
+        columns=['Fuente', 'IdProducto'],
+    ).to_csv(evaluados_path, index=False, encoding='utf-8-sig')
+    
+    logger.info(f"[OK] {len(df_nuevos)} candidatos nuevos, {len(exactos)} por GTIN, "
+                f"emparejamientos: {len(df_matches)}")
+    return df_matches
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    update_matches()
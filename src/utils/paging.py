@@ -0,0 +1,83 @@
+"""
+Tamaño de página adaptativo para endpoints paginados
+Ajusta el tamaño según latencia, tamaño de respuesta y errores observados.
+Los tamaños son múltiplos entre sí, para que el desplazamiento acumulado
+siempre caiga en un límite de página al cambiar de tamaño
+"""
+
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZES = [125, 250, 500, 1000]
+TARGET_LATENCY = 5.0  # segundos por página
+MAX_BYTES = 4 * 1024 * 1024  # tamaño máximo deseado de respuesta
+GROW_AFTER = 3  # páginas rápidas seguidas antes de agrandar
+
+
+class AdaptivePageSize:
+    """Estado del tamaño de página para un endpoint"""
+
+    def __init__(self, sizes: List[int] = PAGE_SIZES, target_latency: float = TARGET_LATENCY,
+                 max_bytes: int = MAX_BYTES):
+        self.sizes = sorted(sizes)
+        self.target_latency = target_latency
+        self.max_bytes = max_bytes
+        self.nivel = len(self.sizes) - 1
+        self.rapidas = 0
+
+    @property
+    def size(self) -> int:
+        return self.sizes[self.nivel]
+
+    @property
+    def is_min(self) -> bool:
+        return self.nivel == 0
+
+    def page_for(self, offset: int) -> int:
+        """Número de página (desde 1) que empieza en offset"""
+        return offset // self.size + 1
+
+    def on_error(self):
+        """Reduce el tamaño tras un error"""
+        self.rapidas = 0
+        if self.nivel > 0:
+            self.nivel -= 1
+            logger.info(f"Tamaño de página reducido a {self.size}")
+
+    def on_success(self, latency: float, nbytes: int, offset: int):
+        """
+        Registra una página exitosa y ajusta el tamaño
+
+        Args:
+            latency: Segundos que tomó la petición
+            nbytes: Bytes de la respuesta
+            offset: Productos obtenidos hasta ahora (tras esta página)
+        """
+        if latency > self.target_latency or nbytes > self.max_bytes:
+            self.on_error()
+            return
+
+        if latency < self.target_latency / 2 and nbytes < self.max_bytes / 2:
+            self.rapidas += 1
+        else:
+            self.rapidas = 0
+
+        # Solo se agranda si el desplazamiento cae en un límite del nuevo tamaño
+        siguiente = self.nivel + 1
+        if (self.rapidas >= GROW_AFTER and siguiente < len(self.sizes)
+                and offset % self.sizes[siguiente] == 0):
+            self.nivel = siguiente
+            self.rapidas = 0
+            logger.info(f"Tamaño de página aumentado a {self.size}")
+
+
+_tuners: Dict[str, AdaptivePageSize] = {}
+
+
+def get_page_size(endpoint: str) -> AdaptivePageSize:
+    """Retorna el estado de tamaño de página de un endpoint (compartido en la ejecución)"""
+    if endpoint not in _tuners:
+        _tuners[endpoint] = AdaptivePageSize()
+    return _tuners[endpoint]
@@ -0,0 +1,75 @@
+"""
+Etapa de parseo en un pool de procesos
+Los fetchers entregan los bytes crudos de la respuesta y el parser decodifica el
+JSON y arma lotes columnares (dict columna -> lista). Con la paginación
+secuencial actual cada página se espera antes de pedir la siguiente, por eso
+el pool solo conviene con fetch concurrente; por defecto se parsea en línea
+"""
+
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Errores de parseo (JSON inválido, ej: página HTML de rate-limit) o del pool
+PARSE_ERRORS = (ValueError, BrokenProcessPool)
+
+
+def get_parse_pool(workers: int):
+    """
+    Crea el pool de procesos para el parseo
+
+    Args:
+        workers: Cantidad de procesos (0 = parsear en el mismo proceso)
+
+    Returns:
+        Context manager con el ProcessPoolExecutor, o None si workers <= 0
+    """
+    if workers and workers > 0:
+        logger.info(f"Pool de parseo: {workers} procesos")
+        return ProcessPoolExecutor(max_workers=workers)
+    return nullcontext(None)
+
+
+def submit_parse(pool, parser: Callable[[bytes], object], content: bytes) -> Future:
+    """
+    Envía bytes crudos al pool; sin pool el parseo se ejecuta en línea
+
+    Args:
+        pool: ProcessPoolExecutor o None
+        parser: Función de parseo a nivel de módulo (debe ser serializable)
+        content: Cuerpo de la respuesta HTTP
+
+    Returns:
+        Future con el resultado del parser
+    """
+    if pool is not None:
+        return pool.submit(parser, content)
+
+    future = Future()
+    try:
+        future.set_result(parser(content))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def concat_batches(batches: List[Dict[str, list]]) -> Dict[str, list]:
+    """
+    Concatena lotes columnares con las mismas columnas
+
+    Returns:
+        Diccionario columna -> valores, o {} si no hay filas
+    """
+    if not batches:
+        return {}
+
+    columnas = {col: [] for col in batches[0]}
+    for batch in batches:
+        for col, valores in columnas.items():
+            valores.extend(batch[col])
+
+    return columnas if any(columnas.values()) else {}
@@ -11,7 +11,7 @@ def productos_unicos(data: List[Dict], source: str = 'farmacorp'):
     Guarda/actualiza archivo maestro de productos únicos
     
     Args:
-        data: Lista de productos con IdProducto, Descripcion
+        data: Lista de productos o columnas (dict columna -> valores) con IdProducto, Descripcion
         source: Nombre del scraper (carpeta donde se guarda)
     """
     if not data:
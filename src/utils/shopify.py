@@ -4,12 +4,14 @@ Funciones reutilizables para cualquier e-commerce basado en Shopify
 """
 
 import requests
+import json
 import time
 import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
 import xml.etree.ElementTree as ET
 from tenacity import retry, stop_after_attempt, wait_exponential
+from src.utils.parsing import submit_parse, PARSE_ERRORS
 
 logger = logging.getLogger(__name__)
 
@@ -31,20 +33,54 @@ def _make_request(url: str, timeout: int = 15) -> requests.Response:
     return response
 
 
-def get_all_products(base_url: str, limit: int = 250, delay: float = 1.0, timeout: int = 15) -> List[Dict]:
+def parse_products_page(content: bytes) -> Dict[str, list]:
     """
-    Obtiene todos los productos desde /products.json con paginación
+    Decodifica una página de /products.json a un lote columnar.
+    Puede ejecutarse en el pool de parseo, por eso recibe bytes y no la respuesta
+    
+    Args:
+        content: Cuerpo de la respuesta HTTP
+        
+    Returns:
+        Diccionario con 'total' (productos en la página, antes de filtrar) y
+        'lote' (columnas IdProducto, Descripcion, PrecioVenta, PrecioOriginal)
+    """
+    products = json.loads(content).get('products', [])
+    
+    lote = {
+        'IdProducto': [],
+        'Descripcion': [],
+        'PrecioVenta': [],
+        'PrecioOriginal': [],
+    }
+    for product in products:
+        data = extract_product_data(product)
+        if not data or not data['IdProducto']:
+            continue
+        for col, valores in lote.items():
+            valores.append(data[col])
+    
+    return {'total': len(products), 'lote': lote}
+
+
+def get_all_product_batches(base_url: str, limit: int = 250, delay: float = 1.0,
+                            timeout: int = 15, pool=None) -> List[Dict[str, list]]:
+    """
+    Obtiene todos los productos desde /products.json con paginación.
+    Cada página se parsea a un lote columnar (opcionalmente en un pool)
     
     Args:
         base_url: URL base de la tienda (ej: 'https://farmacorp.com')
         limit: Cantidad de productos por página
         delay: Delay en segundos entre requests
         timeout: Timeout para cada request
+        pool: ProcessPoolExecutor para el parseo (None = mismo proceso)
         
     Returns:
-        Lista de productos (diccionarios)
+        Lista de lotes columnares, uno por página
     """
-    all_products = []
+    lotes = []
+    total = 0
     page = 1
     
     while True:
@@ -52,15 +88,15 @@ def get_all_products(base_url: str, limit: int = 250, delay: float = 1.0, timeou
         
         try:
             response = _make_request(url, timeout=timeout)
-            data = response.json()
             
-            products = data.get('products', [])
+            resultado = submit_parse(pool, parse_products_page, response.content).result()
             
-            if not products:
+            if not resultado['total']:
                 logger.info(f"No hay más productos. Total páginas: {page - 1}")
                 break
             
-            all_products.extend(products)
+            lotes.append(resultado['lote'])
+            total += resultado['total']
             
             page += 1
             time.sleep(delay)
@@ -68,9 +104,12 @@ def get_all_products(base_url: str, limit: int = 250, delay: float = 1.0, timeou
         except requests.exceptions.RequestException as e:
             logger.error(f"Error obteniendo página {page}: {e}")
             break
+        except PARSE_ERRORS as e:
+            logger.error(f"Error procesando página {page}: {e}")
+            break
     
-    logger.info(f"Total productos obtenidos: {len(all_products)}")
-    return all_products
+    logger.info(f"Total productos obtenidos: {total}")
+    return lotes
 
 
 def extract_product_data(product: Dict) -> Optional[Dict]:
@@ -5,6 +5,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# gzip sin marca de tiempo: mismo contenido -> mismo blob en git
+GZIP_DETERMINISTA = {'method': 'gzip', 'mtime': 0}
+
 def export_data(data: list, 
                 source: str, 
                 output_dir: Path, 
@@ -13,7 +16,7 @@ def export_data(data: list,
     """
     Exportar datos a un archivo
     Args:
-        data: datos
+        data: datos (lista de registros o columnas dict columna -> valores)
         source: fuente de datos 
         output_dir: DATA_DIR
         format: csv, pkl o parquet
@@ -44,9 +47,9 @@ def export_data(data: list,
     
     # Guardar
     if format == 'csv':
-        df.to_csv(filepath, index=False, encoding='utf-8-sig', compression='gzip')
+        df.to_csv(filepath, index=False, encoding='utf-8-sig', compression=GZIP_DETERMINISTA)
     elif format =='pkl':
-        df.to_pickle(filepath, compression='gzip')
+        df.to_pickle(filepath, compression=GZIP_DETERMINISTA)
     elif format == 'parquet':
         df.to_parquet(filepath, index=False)
     else:
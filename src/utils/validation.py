@@ -0,0 +1,161 @@
+"""
+Validación de calidad de datos antes de exportar
+Compara el scraping del día contra el historial reciente:
+- productos por sucursal contra la mediana de los últimos días
+- precios en cero o negativos
+- PrecioOriginal menor a PrecioVenta (cuando hay PrecioOriginal)
+- saltos de precio respecto al día anterior (más de SALTO_MAX veces)
+Las sucursales sospechosas se mueven a cuarentena y no se exportan
+"""
+
+import logging
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+from src.config import DATA_DIR, QUARANTINE_DIR, ARCHIVE_DIRNAME
+from src.utils.compaction import read_daily, read_archive, mes_anterior
+from src.utils.storage import GZIP_DETERMINISTA
+
+logger = logging.getLogger(__name__)
+
+VENTANA = 7  # días de historial para la línea base
+RATIO_MIN_PRODUCTOS = 0.8  # mínimo de productos respecto a la mediana histórica
+SALTO_MAX = 5.0  # variación máxima de precio día a día (x veces)
+MAX_FRACCION_ANOMALA = 0.05  # fracción de filas anómalas que invalida una sucursal
+
+
+def load_history(source: str, data_dir: Path = DATA_DIR, hoy: datetime = None,
+                 ventana: int = VENTANA) -> pd.DataFrame:
+    """
+    Lee los últimos `ventana` días exportados antes de hoy (mes actual y anterior).
+    Solo se leen los archivos diarios necesarios; los archivos mensuales se leen
+    únicamente si los diarios no cubren la ventana
+    
+    Returns:
+        DataFrame con columna 'fecha' (YYYYMMDD), vacío si no hay historial
+    """
+    hoy = (hoy or datetime.now()).strftime("%Y%m%d")
+    source_dir = Path(data_dir) / source
+    meses = [mes_anterior(hoy[:6]), hoy[:6]]
+    
+    diarios = sorted(
+        (filepath for mes in meses for filepath in (source_dir / mes).glob('*.csv.gz')
+         if filepath.name[:8] < hoy),
+        key=lambda filepath: filepath.name,
+    )[-ventana:]
+    frames = [read_daily(filepath) for filepath in diarios]
+    
+    if len(diarios) < ventana:
+        cubiertas = {filepath.name[:8] for filepath in diarios}
+        for mes in meses:
+            archive_path = source_dir / ARCHIVE_DIRNAME / f"{mes}.csv.gz"
+            if archive_path.exists():
+                df = read_archive(archive_path)
+                frames.append(df[(df['fecha'] < hoy) & ~df['fecha'].isin(cubiertas)])
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    df = pd.concat(frames, ignore_index=True)
+    fechas = sorted(df['fecha'].unique())[-ventana:]
+    return df[df['fecha'].isin(fechas)]
+
+
+def _preparar(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipos numéricos y clave de sucursal (IdMarket = 0 si la fuente no tiene)"""
+    df = df.copy()
+    df['IdProducto'] = df['IdProducto'].astype(str)
+    df['PrecioVenta'] = pd.to_numeric(df['PrecioVenta'], errors='coerce')
+    df['PrecioOriginal'] = pd.to_numeric(df['PrecioOriginal'], errors='coerce').fillna(0)
+    if 'IdMarket' not in df.columns:
+        df['IdMarket'] = 0
+    return df
+
+
+def validate_data(data, source: str, data_dir: Path = DATA_DIR,
+                  quarantine_dir: Path = QUARANTINE_DIR, hoy: datetime = None) -> Tuple[Dict[str, list], Dict]:
+    """
+    Valida los datos de un scraper y separa las sucursales sospechosas
+    
+    Args:
+        data: Columnas (dict columna -> valores) o lista de registros del scraper
+        source: Fuente de datos (hipermaxi, farmacorp, ...)
+        data_dir: DATA_DIR (historial)
+        quarantine_dir: Carpeta de cuarentena
+        hoy: Fecha de referencia (por defecto, ahora)
+        
+    Returns:
+        (datos aceptados como columnas, reporte por sucursal)
+    """
+    df_original = pd.DataFrame(data)
+    if df_original.empty:
+        return {}, {}
+    
+    columnas = list(df_original.columns)
+    df = _preparar(df_original)
+    historial = load_history(source, data_dir, hoy)
+    
+    # 1. Anomalías por fila
+    precio_invalido = ~(df['PrecioVenta'] > 0)
+    original_menor = (df['PrecioOriginal'] > 0) & (df['PrecioOriginal'] < df['PrecioVenta'])
+    salto = pd.Series(False, index=df.index)
+    
+    if not historial.empty:
+        historial = _preparar(historial)
+        previo = historial[historial['fecha'] == historial['fecha'].max()]
+        previo = previo.drop_duplicates(subset=['IdProducto', 'IdMarket'])
+        precio_previo = df[['IdProducto', 'IdMarket']].merge(
+            previo[['IdProducto', 'IdMarket', 'PrecioVenta']],
+            on=['IdProducto', 'IdMarket'], how='left',
+        )['PrecioVenta'].to_numpy()
+        ratio = df['PrecioVenta'].to_numpy() / precio_previo
+        salto = pd.Series((ratio > SALTO_MAX) | (ratio < 1 / SALTO_MAX), index=df.index)
+    
+    anomala = precio_invalido | original_menor | salto
+    
+    # 2. Resumen por sucursal
+    reporte = pd.DataFrame({
+        'productos': df.groupby('IdMarket')['IdProducto'].nunique(),
+        'precio_invalido': precio_invalido.groupby(df['IdMarket']).sum(),
+        'original_menor': original_menor.groupby(df['IdMarket']).sum(),
+        'salto': salto.groupby(df['IdMarket']).sum(),
+        'fraccion_anomala': anomala.groupby(df['IdMarket']).mean(),
+    })
+    
+    if not historial.empty:
+        base = historial.groupby(['IdMarket', 'fecha'])['IdProducto'].nunique()
+        reporte['base'] = base.groupby(level='IdMarket').median()
+    else:
+        reporte['base'] = float('nan')
+    
+    # Sin historial para la sucursal no se puede comparar el conteo
+    catalogo_parcial = reporte['productos'] < RATIO_MIN_PRODUCTOS * reporte['base']
+    reporte['sospechosa'] = catalogo_parcial | (reporte['fraccion_anomala'] > MAX_FRACCION_ANOMALA)
+    
+    # 3. Cuarentena: sucursales sospechosas completas y filas con precio inválido
+    sospechosas = reporte.index[reporte['sospechosa']]
+    cuarentena = df['IdMarket'].isin(sospechosas) | precio_invalido
+    
+    for id_market, fila in reporte.iterrows():
+        mensaje = (f"Validación {source} [{id_market}]: {fila['productos']} productos "
+                   f"(base {fila['base']}), precio inválido {fila['precio_invalido']}, "
+                   f"original < venta {fila['original_menor']}, saltos {fila['salto']}")
+        if fila['sospechosa']:
+            logger.warning(f"{mensaje} -> CUARENTENA")
+        else:
+            logger.info(mensaje)
+    
+    if cuarentena.any():
+        fecha = (hoy or datetime.now()).strftime("%Y%m%d")
+        filepath = Path(quarantine_dir) / source / f"{fecha}.csv.gz"
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        df_original[cuarentena.to_numpy()].to_csv(
+            filepath, index=False, encoding='utf-8-sig', compression=GZIP_DETERMINISTA
+        )
+        logger.warning(f"{int(cuarentena.sum())} registros en cuarentena: {filepath}")
+    
+    aceptados = df_original[~cuarentena.to_numpy()]
+    if aceptados.empty:
+        return {}, reporte.to_dict('index')
+    return {col: aceptados[col].tolist() for col in columnas}, reporte.to_dict('index')
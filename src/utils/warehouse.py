@@ -0,0 +1,145 @@
+"""
+Almacén local de precios en SQLite
+Carga masiva de los archivos diarios exportados para consultas analíticas
+(historial de un producto por sucursal, variaciones de precio, etc.)
+
+Uso para cargar el historial existente de data/raw:
+    python -m src.utils.warehouse --backfill
+"""
+
+import argparse
+import logging
+import sqlite3
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+from src.config import DATA_DIR, WAREHOUSE_DB
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS precios (
+    fuente TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    IdProducto TEXT NOT NULL,
+    IdMarket INTEGER NOT NULL DEFAULT 0,
+    IdRegion INTEGER,
+    PrecioVenta REAL,
+    PrecioOriginal REAL,
+    PRIMARY KEY (fuente, IdProducto, IdMarket, fecha)
+);
+CREATE INDEX IF NOT EXISTS idx_precios_producto_market_fecha
+    ON precios (IdProducto, IdMarket, fecha);
+CREATE INDEX IF NOT EXISTS idx_precios_fecha
+    ON precios (fuente, fecha);
+"""
+
+COLUMNS = ['fuente', 'fecha', 'IdProducto', 'IdMarket', 'IdRegion', 'PrecioVenta', 'PrecioOriginal']
+
+
+def get_connection(db_path: Path = WAREHOUSE_DB) -> sqlite3.Connection:
+    """Abre la base de datos y crea el esquema si no existe"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _read_file(filepath: Path, source: str) -> pd.DataFrame:
+    """Lee un archivo diario exportado y lo ajusta a las columnas del almacén"""
+    filepath = Path(filepath)
+    df = pd.read_csv(filepath, dtype={'IdProducto': str}, encoding='utf-8-sig')
+    
+    df['fuente'] = source
+    if 'fecha' in df.columns:
+        # Archivo mensual compactado: columna fecha YYYYMMDD
+        df['fecha'] = pd.to_datetime(df['fecha'].astype(str), format="%Y%m%d").dt.strftime("%Y-%m-%d")
+    else:
+        # Archivo diario: YYYYMMDD.csv.gz
+        df['fecha'] = datetime.strptime(filepath.name[:8], "%Y%m%d").strftime("%Y-%m-%d")
+    
+    # Fuentes sin sucursal (ej: Farmacorp) usan IdMarket = 0
+    if 'IdMarket' not in df.columns:
+        df['IdMarket'] = 0
+    if 'IdRegion' not in df.columns:
+        df['IdRegion'] = None
+    
+    df = df.dropna(subset=['IdProducto'])
+    df = df[COLUMNS].astype(object).where(df[COLUMNS].notna(), None)
+    return df
+
+
+def _insert(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """Inserta filas con executemany; reemplaza registros del mismo día"""
+    conn.executemany(
+        f"INSERT OR REPLACE INTO precios ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))})",
+        df.itertuples(index=False, name=None),
+    )
+    return len(df)
+
+
+def load_files(archivos: List[Tuple[str, Path]], db_path: Path = WAREHOUSE_DB) -> int:
+    """
+    Carga archivos al almacén en una sola transacción: si alguno falla,
+    no se carga ninguno
+    
+    Args:
+        archivos: Pares (fuente, archivo) con archivos diarios de export_data
+                  (formato csv) o mensuales compactados
+        db_path: Ruta de la base de datos SQLite
+        
+    Returns:
+        Cantidad de filas cargadas
+    """
+    conn = get_connection(db_path)
+    total = 0
+    try:
+        with conn:
+            for source, filepath in archivos:
+                total += _insert(conn, _read_file(filepath, source))
+    finally:
+        conn.close()
+    
+    logger.info(f"[OK] Almacén: {total} registros de {len(archivos)} archivos cargados en {db_path}")
+    return total
+
+
+def backfill(data_dir: Path = DATA_DIR, db_path: Path = WAREHOUSE_DB) -> int:
+    """
+    Carga todo el historial de data/raw al almacén
+    
+    Args:
+        data_dir: DATA_DIR
+        db_path: Ruta de la base de datos SQLite
+        
+    Returns:
+        Cantidad de filas cargadas
+    """
+    archivos = []
+    for source_dir in sorted(p for p in Path(data_dir).iterdir() if p.is_dir()):
+        filepaths = sorted(source_dir.glob('*/*.csv.gz'))
+        logger.info(f"Backfill {source_dir.name}: {len(filepaths)} archivos")
+        archivos.extend((source_dir.name, filepath) for filepath in filepaths)
+    return load_files(archivos, db_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    
+    parser = argparse.ArgumentParser(description="Almacén local de precios (SQLite)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Cargar todo el historial de data/raw")
+    parser.add_argument('--db', type=Path, default=WAREHOUSE_DB,
+                        help="Ruta de la base de datos SQLite")
+    args = parser.parse_args()
+    
+    if args.backfill:
+        backfill(DATA_DIR, args.db)
+    else:
+        parser.print_help()